@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-14 04:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("medtrackerapp", "0002_note"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="doselog",
+            index=models.Index(
+                fields=["taken_at"], name="medtrackera_taken_a_47d9c1_idx"
+            ),
+        ),
+    ]
@@ -51,9 +51,29 @@ class Medication(models.Model):
         Raises:
             ValueError: If days < 0 or prescribed_per_day ≤ 0.
         """
-        if days < 0 or self.prescribed_per_day <= 0:
+        return self.calculate_expected_doses(days, self.prescribed_per_day)
+
+    @staticmethod
+    def calculate_expected_doses(days: int, prescribed_per_day: int) -> int:
+        """
+        Compute the expected dose count from a raw daily schedule.
+
+        Shared by `expected_doses()` and callers that only have the
+        schedule value, not a Medication instance.
+
+        Args:
+            days (int): Number of calendar days (must be ≥ 0).
+            prescribed_per_day (int): Doses per day (must be > 0).
+
+        Returns:
+            int: Expected dose count for the period.
+
+        Raises:
+            ValueError: If days < 0 or prescribed_per_day ≤ 0.
+        """
+        if days < 0 or prescribed_per_day <= 0:
             raise ValueError("Days and schedule must be positive.")
-        return days * self.prescribed_per_day
+        return days * prescribed_per_day
 
     def adherence_rate_over_period(self, start_date: _date, end_date: _date) -> float:
         """
@@ -97,12 +117,29 @@ class Medication(models.Model):
         Uses the `DrugInfoService` to query OpenFDA for details
         about this medication's active ingredient or related data.
 
+        Returns:
+            dict: Drug information data, or {'error': message} if the
+                  request fails or the API is unavailable.
+        """
+        return self.fetch_drug_info(self.name)
+
+    @staticmethod
+    def fetch_drug_info(name: str):
+        """
+        Retrieve drug information for a medication name from OpenFDA.
+
+        Shared by `fetch_external_info()` and callers that only have
+        the name, not a Medication instance.
+
+        Args:
+            name (str): Medication name to look up.
+
         Returns:
             dict: Drug information data, or {'error': message} if the
                   request fails or the API is unavailable.
         """
         try:
-            return DrugInfoService.get_drug_info(self.name)
+            return DrugInfoService.get_drug_info(name)
         except Exception as exc:
             return {"error": str(exc)}
 
@@ -123,6 +160,7 @@ class DoseLog(models.Model):
         """Metadata options for the DoseLog model."""
 
         ordering = ["-taken_at"]
+        indexes = [models.Index(fields=["taken_at"])]
 
     def __str__(self):
         """Return a human-readable description of the dose event."""
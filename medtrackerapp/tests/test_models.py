@@ -5,47 +5,44 @@ from medtrackerapp.models import Medication, DoseLog
 from django.utils import timezone
 from datetime import timedelta, date, datetime
 
+# Five doses between 2025-10-01 and 2025-10-03, out of six expected.
+_ADHERENCE_TIMES = (
+    datetime(2025, 10, 1, 0, 0),
+    datetime(2025, 10, 1, 20, 10),
+    datetime(2025, 10, 2, 10, 10),
+    datetime(2025, 10, 2, 20, 10),
+    datetime(2025, 10, 3, 23, 59),
+)
+
 
 class MedicationModelTests(TestCase):
-    def setUp(self):
-        self.med = Medication.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        cls.med = Medication.objects.create(
             name="Aspirin", dosage_mg=100, prescribed_per_day=2
         )
 
     def test_str_returns_name_and_dosage(self):
-        med = Medication.objects.create(
-            name="Aspirin", dosage_mg=100, prescribed_per_day=2
-        )
-        self.assertEqual(str(med), "Aspirin (100mg)")
+        self.assertEqual(str(self.med), "Aspirin (100mg)")
 
     def test_adherence_rate_all_doses_taken(self):
-        med = Medication.objects.create(
-            name="Aspirin", dosage_mg=100, prescribed_per_day=2
-        )
-
         now = timezone.now()
-        DoseLog.objects.create(medication=med, taken_at=now - timedelta(hours=30))
-        DoseLog.objects.create(medication=med, taken_at=now - timedelta(hours=1))
+        DoseLog.objects.create(medication=self.med, taken_at=now - timedelta(hours=30))
+        DoseLog.objects.create(medication=self.med, taken_at=now - timedelta(hours=1))
 
-        adherence = med.adherence_rate()
+        adherence = self.med.adherence_rate()
         self.assertEqual(adherence, 100.0)
 
     def test_adherence_rate_all_doses_missed(self):
-        med = Medication.objects.create(
-            name="Aspirin", dosage_mg=100, prescribed_per_day=2
-        )
         now = timezone.now()
         DoseLog.objects.create(
-            medication=med, taken_at=now - timedelta(hours=2), was_taken=False
+            medication=self.med, taken_at=now - timedelta(hours=2), was_taken=False
         )
-        DoseLog.objects.create(medication=med, taken_at=now, was_taken=False)
-        self.assertEqual(med.adherence_rate(), 0.0)
+        DoseLog.objects.create(medication=self.med, taken_at=now, was_taken=False)
+        self.assertEqual(self.med.adherence_rate(), 0.0)
 
     def test_adherence_rate_no_logs(self):
-        med = Medication.objects.create(
-            name="Aspirin", dosage_mg=100, prescribed_per_day=2
-        )
-        self.assertEqual(med.adherence_rate(), 0.0)
+        self.assertEqual(self.med.adherence_rate(), 0.0)
 
     def test_expected_doses(self):
         med = Medication.objects.create(
@@ -55,17 +52,16 @@ class MedicationModelTests(TestCase):
         self.assertEqual(med.expected_doses(days), 5 * 3)
 
     def test_expected_doses_negative_days(self):
-        med = Medication.objects.create(
-            name="Aspirin", dosage_mg=100, prescribed_per_day=2
-        )
         with self.assertRaises(ValueError):
-            med.expected_doses(-5)
+            self.med.expected_doses(-5)
 
     def test_expected_doses_zero_days(self):
-        med = Medication.objects.create(
-            name="Aspirin", dosage_mg=100, prescribed_per_day=2
-        )
-        self.assertEqual(med.expected_doses(0), 0)
+        self.assertEqual(self.med.expected_doses(0), 0)
+
+    def test_calculate_expected_doses_without_instance(self):
+        self.assertEqual(Medication.calculate_expected_doses(4, 3), 12)
+        with self.assertRaises(ValueError):
+            Medication.calculate_expected_doses(4, 0)
 
     def test_invalid_date_medication(self):
         med = Medication.objects.create(
@@ -78,25 +74,27 @@ class MedicationModelTests(TestCase):
     def test_adherence_rate_period_some_dose_taken(self):
         start = date(2025, 10, 1)
         end = date(2025, 10, 3)
-        DoseLog.objects.create(
-            medication=self.med, taken_at=datetime(2025, 10, 1, 0, 0)
-        )
-        DoseLog.objects.create(
-            medication=self.med, taken_at=datetime(2025, 10, 1, 20, 10)
-        )
-        DoseLog.objects.create(
-            medication=self.med, taken_at=datetime(2025, 10, 2, 10, 10)
-        )
-        DoseLog.objects.create(
-            medication=self.med, taken_at=datetime(2025, 10, 2, 20, 10)
-        )
-        DoseLog.objects.create(
-            medication=self.med, taken_at=datetime(2025, 10, 3, 23, 59)
+        DoseLog.objects.bulk_create(
+            [DoseLog(medication=self.med, taken_at=t) for t in _ADHERENCE_TIMES]
         )
 
         rate = self.med.adherence_rate_over_period(start, end)
         self.assertEqual(rate, round(100 * 5 / 6, 2))
 
+    def test_adherence_rate_over_period_many_logs(self):
+        start = date(2025, 10, 1)
+        end = date(2025, 10, 30)
+        first = timezone.make_aware(datetime(2025, 10, 1, 8, 0))
+        # Two doses a day, twelve hours apart, for the whole period.
+        logs = [
+            DoseLog(medication=self.med, taken_at=first + timedelta(hours=12 * i))
+            for i in range(60)
+        ]
+        DoseLog.objects.bulk_create(logs)
+
+        rate = self.med.adherence_rate_over_period(start, end)
+        self.assertEqual(rate, 100.0)
+
     def test_adherence_rate_over_period_expected_zero(self):
         med = Medication.objects.create(
             name="TestMed", dosage_mg=50, prescribed_per_day=2
@@ -113,51 +111,49 @@ class MedicationModelTests(TestCase):
         start = date(2025, 10, 2)
         end = date(2025, 10, 3)
 
-        DoseLog.objects.create(medication=med, taken_at=datetime(2025, 10, 1, 10, 10))
-        DoseLog.objects.create(medication=med, taken_at=datetime(2025, 10, 1, 20, 10))
-        DoseLog.objects.create(medication=med, taken_at=datetime(2025, 10, 4, 0, 0))
-        DoseLog.objects.create(medication=med, taken_at=datetime(2025, 10, 4, 20, 10))
+        DoseLog.objects.bulk_create(
+            [
+                DoseLog(medication=med, taken_at=datetime(2025, 10, 1, 10, 10)),
+                DoseLog(medication=med, taken_at=datetime(2025, 10, 1, 20, 10)),
+                DoseLog(medication=med, taken_at=datetime(2025, 10, 4, 0, 0)),
+                DoseLog(medication=med, taken_at=datetime(2025, 10, 4, 20, 10)),
+            ]
+        )
 
         rate = self.med.adherence_rate_over_period(start, end)
         self.assertEqual(rate, 0.0)
 
     def test_adherence_rate_over_period_invalid_date_range(self):
-        med = Medication.objects.create(
-            name="Aspirin", dosage_mg=100, prescribed_per_day=2
-        )
         start = date(2025, 10, 5)
         end = date(2025, 10, 1)
         with self.assertRaises(ValueError):
-            med.adherence_rate_over_period(start, end)
+            self.med.adherence_rate_over_period(start, end)
 
-    def test_fetch_external_info_success(self):
-        from unittest.mock import patch
-
-        med = Medication.objects.create(
-            name="Aspirin", dosage_mg=100, prescribed_per_day=2
-        )
-        with patch("medtrackerapp.services.DrugInfoService.get_drug_info") as mock_get:
-            mock_get.return_value = {"generic_name": "aspirin", "brand_name": "Bayer"}
-            result = med.fetch_external_info()
-            self.assertIn("generic_name", result)
-            mock_get.assert_called_once_with("Aspirin")
+    @patch("medtrackerapp.services.DrugInfoService.get_drug_info")
+    def test_fetch_external_info_success(self, mock_get):
+        mock_get.return_value = {"generic_name": "aspirin", "brand_name": "Bayer"}
+        result = self.med.fetch_external_info()
+        self.assertIn("generic_name", result)
+        mock_get.assert_called_once_with("Aspirin")
 
-    def test_fetch_external_info_error(self):
-        from unittest.mock import patch
+    @patch("medtrackerapp.services.DrugInfoService.get_drug_info")
+    def test_fetch_drug_info_without_instance(self, mock_get):
+        mock_get.side_effect = Exception("API Error")
+        self.assertEqual(Medication.fetch_drug_info("Aspirin"), {"error": "API Error"})
+        mock_get.assert_called_once_with("Aspirin")
 
-        med = Medication.objects.create(
-            name="Aspirin", dosage_mg=100, prescribed_per_day=2
-        )
-        with patch("medtrackerapp.services.DrugInfoService.get_drug_info") as mock_get:
-            mock_get.side_effect = Exception("API Error")
-            result = med.fetch_external_info()
-            self.assertIn("error", result)
-            self.assertEqual(result["error"], "API Error")
+    @patch("medtrackerapp.services.DrugInfoService.get_drug_info")
+    def test_fetch_external_info_error(self, mock_get):
+        mock_get.side_effect = Exception("API Error")
+        result = self.med.fetch_external_info()
+        self.assertIn("error", result)
+        self.assertEqual(result["error"], "API Error")
 
 
 class DoseLogModelTests(TestCase):
-    def setUp(self):
-        self.med = Medication.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        cls.med = Medication.objects.create(
             name="Ibuprofen", dosage_mg=200, prescribed_per_day=3
         )
 
@@ -183,13 +179,14 @@ class DoseLogModelTests(TestCase):
         self.assertTrue(log.was_taken)
 
     def test_doselog_ordering(self):
-        time1 = timezone.now() - timedelta(hours=2)
-        time2 = timezone.now() - timedelta(hours=1)
-        time3 = timezone.now()
+        now = timezone.now()
+        time1 = now - timedelta(hours=2)
+        time2 = now - timedelta(hours=1)
+        time3 = now
 
-        DoseLog.objects.create(medication=self.med, taken_at=time1)
-        DoseLog.objects.create(medication=self.med, taken_at=time3)
-        DoseLog.objects.create(medication=self.med, taken_at=time2)
+        DoseLog.objects.bulk_create(
+            [DoseLog(medication=self.med, taken_at=t) for t in (time1, time3, time2)]
+        )
 
         logs = DoseLog.objects.all()
         self.assertEqual(logs[0].taken_at, time3)
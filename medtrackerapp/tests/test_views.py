@@ -1,82 +1,119 @@
+import warnings
+
 from rest_framework.test import APITestCase
 from medtrackerapp.models import Medication, DoseLog
+from django.core.cache import cache
+from django.core.cache.backends.base import CacheKeyWarning
+from django.test import override_settings
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
-from datetime import timedelta
+from datetime import timedelta, datetime
 from unittest.mock import patch
 
 
 class MedicationViewTests(APITestCase):
-    def setUp(self):
-        self.med = Medication.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        cls.med = Medication.objects.create(
             name="Aspirin", dosage_mg=100, prescribed_per_day=2
         )
+        cls.list_url = reverse("medication-list")
+        cls.detail_url = reverse("medication-detail", args=[cls.med.pk])
+        cls.missing_detail_url = reverse("medication-detail", args=[9999])
+        cls.info_url = reverse("medication-get-external-info", args=[cls.med.pk])
+        cls.missing_info_url = reverse("medication-get-external-info", args=[9999])
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
 
     def test_list_medications_valid_data(self):
-        url = reverse("medication-list")
-        response = self.client.get(url)
+        url = self.list_url
+        # One SELECT for the list plus the adherence exists() check. This
+        # grows per row: see test_list_medications_query_count_per_row.
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]["name"], "Aspirin")
         self.assertEqual(response.data[0]["dosage_mg"], 100)
 
+    def test_list_medications_query_count_per_row(self):
+        other = Medication.objects.create(
+            name="Ibuprofen", dosage_mg=200, prescribed_per_day=3
+        )
+        now = timezone.now()
+        DoseLog.objects.bulk_create(
+            [
+                DoseLog(medication=self.med, taken_at=now),
+                DoseLog(medication=other, taken_at=now, was_taken=False),
+            ]
+        )
+        # MedicationSerializer.get_adherence runs exists() plus two count()
+        # queries per medication with logs: 1 + 3 * 2.
+        with self.assertNumQueries(7):
+            response = self.client.get(self.list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+
     def test_create_medication_valid(self):
-        url = reverse("medication-list")
+        url = self.list_url
         data = {"name": "Ibuprofen", "dosage_mg": 200, "prescribed_per_day": 3}
         response = self.client.post(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(response.data["name"], "Ibuprofen")
 
     def test_create_medication_invalid(self):
-        url = reverse("medication-list")
+        url = self.list_url
         data = {"name": "", "dosage_mg": -10, "prescribed_per_day": 0}  # invalid data
         response = self.client.post(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_retrieve_medication_valid(self):
-        url = reverse("medication-detail", args=[self.med.pk])
+        url = self.detail_url
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["name"], "Aspirin")
 
     def test_retrieve_medication_invalid(self):
-        url = reverse("medication-detail", args=[9999])
+        url = self.missing_detail_url
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_update_medication_valid(self):
-        url = reverse("medication-detail", args=[self.med.pk])
+        url = self.detail_url
         data = {"name": "Aspirin Updated", "dosage_mg": 150, "prescribed_per_day": 2}
         response = self.client.put(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["name"], "Aspirin Updated")
 
     def test_update_medication_invalid_data(self):
-        url = reverse("medication-detail", args=[self.med.pk])
+        url = self.detail_url
         data = {"name": "", "dosage_mg": -100, "prescribed_per_day": -1}
         response = self.client.put(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_update_medication_invalid_id(self):
-        url = reverse("medication-detail", args=[9999])
+        url = self.missing_detail_url
         data = {"name": "Name", "dosage_mg": 100, "prescribed_per_day": 2}
         response = self.client.put(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_delete_medication_valid(self):
-        url = reverse("medication-detail", args=[self.med.pk])
+        url = self.detail_url
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
     def test_delete_medication_invalid(self):
-        url = reverse("medication-detail", args=[9999])
+        url = self.missing_detail_url
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_get_external_info_success(self):
-        url = reverse("medication-get-external-info", args=[self.med.pk])
+        url = self.info_url
         response = self.client.get(url)
         # Accept 200 or 502 depending on external API availability, assert response structure
         self.assertIn(
@@ -84,28 +121,38 @@ class MedicationViewTests(APITestCase):
         )
 
     def test_get_external_info_invalid_id(self):
-        url = reverse("medication-get-external-info", args=[9999])
+        url = self.missing_info_url
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
 
 class DoseLogViewTests(APITestCase):
-    def setUp(self):
-        self.med = Medication.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        cls.med = Medication.objects.create(
             name="Ibuprofen", dosage_mg=200, prescribed_per_day=3
         )
-        self.log = DoseLog.objects.create(
-            medication=self.med, taken_at=timezone.now(), was_taken=True
+        cls.log = DoseLog.objects.create(
+            medication=cls.med, taken_at=timezone.now(), was_taken=True
         )
+        cls.list_url = reverse("doselog-list")
+        cls.detail_url = reverse("doselog-detail", args=[cls.log.pk])
+        cls.missing_detail_url = reverse("doselog-detail", args=[9999])
+        cls.filter_url = reverse("doselog-filter-by-date")
 
     def test_list_dose_logs(self):
-        url = reverse("doselog-list")
-        response = self.client.get(url)
+        DoseLog.objects.create(
+            medication=self.med, taken_at=timezone.now() - timedelta(hours=1)
+        )
+        url = self.list_url
+        # The serializer reads only medication_id, so rows add no queries.
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(any(d["id"] == self.log.id for d in response.data))
 
     def test_create_dose_log_valid(self):
-        url = reverse("doselog-list")
+        url = self.list_url
         data = {
             "medication": self.med.pk,
             "taken_at": (timezone.now() - timedelta(days=1)).isoformat(),
@@ -115,23 +162,23 @@ class DoseLogViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
     def test_create_dose_log_invalid(self):
-        url = reverse("doselog-list")
+        url = self.list_url
         data = {"medication": 9999, "taken_at": "", "was_taken": "invalid"}
         response = self.client.post(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_retrieve_dose_log_valid(self):
-        url = reverse("doselog-detail", args=[self.log.pk])
+        url = self.detail_url
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
     def test_retrieve_dose_log_invalid(self):
-        url = reverse("doselog-detail", args=[9999])
+        url = self.missing_detail_url
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_update_dose_log_valid(self):
-        url = reverse("doselog-detail", args=[self.log.pk])
+        url = self.detail_url
         data = {
             "medication": self.med.pk,
             "taken_at": timezone.now().isoformat(),
@@ -142,13 +189,13 @@ class DoseLogViewTests(APITestCase):
         self.assertFalse(response.data["was_taken"])
 
     def test_update_dose_log_invalid_data(self):
-        url = reverse("doselog-detail", args=[self.log.pk])
+        url = self.detail_url
         data = {"medication": "invalid", "taken_at": "bad date", "was_taken": "no"}
         response = self.client.put(url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_update_dose_log_invalid_id(self):
-        url = reverse("doselog-detail", args=[9999])
+        url = self.missing_detail_url
         data = {
             "medication": self.med.pk,
             "taken_at": timezone.now().isoformat(),
@@ -158,38 +205,91 @@ class DoseLogViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_delete_dose_log_valid(self):
-        url = reverse("doselog-detail", args=[self.log.pk])
+        url = self.detail_url
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
     def test_delete_dose_log_invalid(self):
-        url = reverse("doselog-detail", args=[9999])
+        url = self.missing_detail_url
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_filter_dose_logs_valid_range(self):
-        url = reverse("doselog-filter-by-date")
+        url = self.filter_url
         start_date = (timezone.now() - timedelta(days=2)).date().isoformat()
         end_date = timezone.now().date().isoformat()
+        with self.assertNumQueries(1):
+            response = self.client.get(f"{url}?start={start_date}&end={end_date}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.json(),
+            [self.client.get(self.detail_url).json()],
+        )
+
+    def test_filter_dose_logs_includes_whole_end_day(self):
+        inside = DoseLog.objects.create(
+            medication=self.med,
+            taken_at=timezone.make_aware(datetime(2025, 11, 7, 23, 59)),
+        )
+        DoseLog.objects.create(
+            medication=self.med,
+            taken_at=timezone.make_aware(datetime(2025, 11, 8, 0, 0)),
+        )
+        url = self.filter_url
+        response = self.client.get(f"{url}?start=2025-11-01&end=2025-11-07")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([d["id"] for d in response.data], [inside.id])
+
+    def test_filter_dose_logs_end_at_max_date(self):
+        url = self.filter_url
+        response = self.client.get(f"{url}?start=2025-01-01&end=9999-12-31")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([d["id"] for d in response.data], [self.log.id])
+
+    @override_settings(TIME_ZONE="Asia/Tokyo")
+    def test_filter_dose_logs_start_before_min_utc_returns_400(self):
+        url = self.filter_url
+        response = self.client.get(f"{url}?start=0001-01-01&end=2025-11-07")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("error", response.data)
+
+    @override_settings(TIME_ZONE="Europe/Warsaw")
+    def test_filter_dose_logs_matches_detail_outside_utc(self):
+        url = self.filter_url
+        start_date = (timezone.now() - timedelta(days=2)).date().isoformat()
+        end_date = (timezone.now() + timedelta(days=1)).date().isoformat()
         response = self.client.get(f"{url}?start={start_date}&end={end_date}")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), [self.client.get(self.detail_url).json()])
+
+    def test_filter_dose_logs_reversed_range(self):
+        url = self.filter_url
+        with self.assertNumQueries(0):
+            response = self.client.get(f"{url}?start=2025-11-07&end=2025-11-01")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_filter_dose_logs_missing_params(self):
-        url = reverse("doselog-filter-by-date")  # possibly different name
+        url = self.filter_url
         response = self.client.get(f"{url}?start=&end=")
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_filter_dose_logs_invalid_params(self):
-        url = reverse("doselog-filter-by-date")
+        url = self.filter_url
         response = self.client.get(f"{url}?start=bad&end=invalid")
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
 
 class MedicationExternalInfoTest(APITestCase):
-    def setUp(self):
-        self.med = Medication.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        cls.med = Medication.objects.create(
             name="Aspirin", dosage_mg=100, prescribed_per_day=2
         )
+        cls.info_url = reverse("medication-get-external-info", args=[cls.med.pk])
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
 
     @patch("medtrackerapp.services.DrugInfoService.get_drug_info")
     def test_external_info_success(self, mock_get_drug_info):
@@ -200,8 +300,9 @@ class MedicationExternalInfoTest(APITestCase):
             "purpose": "Pain relief",
         }
 
-        url = reverse("medication-get-external-info", args=[self.med.pk])
-        response = self.client.get(url)
+        url = self.info_url
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn("generic_name", response.data)
@@ -212,17 +313,58 @@ class MedicationExternalInfoTest(APITestCase):
         # Mock an exception raised by the API call
         mock_get_drug_info.side_effect = Exception("API failure")
 
-        url = reverse("medication-get-external-info", args=[self.med.pk])
+        url = self.info_url
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_502_BAD_GATEWAY)
         self.assertIn("error", response.data)
         self.assertEqual(response.data["error"], "API failure")
 
+    @patch("medtrackerapp.services.DrugInfoService.get_drug_info")
+    def test_external_info_is_cached(self, mock_get_drug_info):
+        mock_get_drug_info.return_value = {"generic_name": "aspirin"}
+
+        url = self.info_url
+        first = self.client.get(url)
+        second = self.client.get(url)
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        mock_get_drug_info.assert_called_once_with("Aspirin")
+
+    @patch("medtrackerapp.services.DrugInfoService.get_drug_info")
+    def test_external_info_cache_key_safe_for_free_text_name(self, mock_get_drug_info):
+        mock_get_drug_info.return_value = {"generic_name": "cholecalciferol"}
+        med = Medication.objects.create(
+            name="Vitamin D", dosage_mg=25, prescribed_per_day=1
+        )
+
+        url = reverse("medication-get-external-info", args=[med.pk])
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", CacheKeyWarning)
+            first = self.client.get(url)
+            second = self.client.get(url)
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        mock_get_drug_info.assert_called_once_with("Vitamin D")
+
+    @patch("medtrackerapp.services.DrugInfoService.get_drug_info")
+    def test_external_info_failure_is_not_cached(self, mock_get_drug_info):
+        mock_get_drug_info.side_effect = Exception("API failure")
+
+        url = self.info_url
+        self.client.get(url)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_502_BAD_GATEWAY)
+        self.assertEqual(mock_get_drug_info.call_count, 2)
+
 
 class ExpectedDosesEndpointTest(APITestCase):
-    def setUp(self):
-        self.med = Medication.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        cls.med = Medication.objects.create(
             name="Aspirin", dosage_mg=100, prescribed_per_day=2
         )
 
@@ -257,30 +399,52 @@ class ExpectedDosesEndpointTest(APITestCase):
         )
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_signed_or_padded_days_returns_400(self):
+        for days in ("+5", " 5", "5 "):
+            response = self.client.get(
+                f"/api/medications/{self.med.id}/expected-doses/", {"days": days}
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_overlong_days_returns_400(self):
+        response = self.client.get(
+            f"/api/medications/{self.med.id}/expected-doses/", {"days": "9" * 5000}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["error"], "Query parameter 'days' must be a positive integer."
+        )
+
     def test_zero_days_returns_400(self):
         response = self.client.get(
             f"/api/medications/{self.med.id}/expected-doses/", {"days": 0}
         )
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
-    def test_expected_doses_valueerror_returns_400(self):
-        days = 3
-        with patch.object(Medication, "expected_doses", side_effect=ValueError("boom")):
-            response = self.client.get(
-                f"/api/medications/{self.med.id}/expected-doses/?days={days}"
-            )
-
+    def test_expected_doses_zero_schedule_returns_400(self):
+        med = Medication.objects.create(
+            name="Placebo", dosage_mg=100, prescribed_per_day=0
+        )
+        response = self.client.get(
+            f"/api/medications/{med.id}/expected-doses/", {"days": 3}
+        )
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_expected_doses_invalid_id_returns_404(self):
+        response = self.client.get("/api/medications/9999/expected-doses/", {"days": 3})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
 
 class NoteViewTests(APITestCase):
-    def setUp(self):
-        self.med = Medication.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        cls.med = Medication.objects.create(
             name="Aspirin", dosage_mg=100, prescribed_per_day=2
         )
+        cls.list_url = reverse("note-list")
 
     def test_create_note_returns_201(self):
-        url = reverse("note-list")
+        url = self.list_url
         payload = {"medication": self.med.id, "text": "Patient reported mild nausea."}
         response = self.client.post(url, payload, format="json")
 
@@ -291,23 +455,23 @@ class NoteViewTests(APITestCase):
 
     def test_list_notes_returns_200(self):
         self.client.post(
-            reverse("note-list"),
+            self.list_url,
             {"medication": self.med.id, "text": "A"},
             format="json",
         )
         self.client.post(
-            reverse("note-list"),
+            self.list_url,
             {"medication": self.med.id, "text": "B"},
             format="json",
         )
 
-        response = self.client.get(reverse("note-list"))
+        response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertGreaterEqual(len(response.data), 2)
 
     def test_retrieve_note_returns_200(self):
         create = self.client.post(
-            reverse("note-list"),
+            self.list_url,
             {"medication": self.med.id, "text": "Follow-up in 2 weeks."},
             format="json",
         )
@@ -321,7 +485,7 @@ class NoteViewTests(APITestCase):
 
     def test_delete_note_returns_204(self):
         create = self.client.post(
-            reverse("note-list"),
+            self.list_url,
             {"medication": self.med.id, "text": "Stop if rash develops."},
             format="json",
         )
@@ -332,7 +496,7 @@ class NoteViewTests(APITestCase):
 
     def test_update_note_not_supported_returns_405(self):
         create = self.client.post(
-            reverse("note-list"),
+            self.list_url,
             {"medication": self.med.id, "text": "Original"},
             format="json",
         )
@@ -1,12 +1,36 @@
 from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
+import hashlib
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from django.core.cache import cache
+from django.utils import timezone
 from django.utils.dateparse import parse_date
 from .models import Medication, DoseLog, Note
 from .serializers import MedicationSerializer, DoseLogSerializer, NoteSerializer
 from rest_framework.filters import SearchFilter
 
 
+_EXTERNAL_INFO_CACHE_TIMEOUT = 60 * 60
+
+_ERR_MISSING_PARAM = "Query parameter '{}' is required."
+_ERR_NOT_POSITIVE_INT = "Query parameter '{}' must be a positive integer."
+
+
+def _external_info_cache_key(name: str) -> str:
+    """Build a cache key for a medication name.
+
+    Names are free text, so they are hashed to keep keys safe for every
+    cache backend (e.g. memcached rejects spaces and control characters).
+    """
+    digest = hashlib.md5(
+        name.lower().encode("utf-8"), usedforsecurity=False
+    ).hexdigest()
+    return f"openfda:{digest}"
+
+
 def _get_required_positive_int_query_param(request, name: str) -> int:
     """Parse a required positive integer query parameter.
 
@@ -15,17 +39,20 @@ def _get_required_positive_int_query_param(request, name: str) -> int:
     """
     raw_value = request.query_params.get(name)
     if raw_value is None:
-        raise ValueError(f"Query parameter '{name}' is required.")
+        raise ValueError(_ERR_MISSING_PARAM.format(name))
+
+    # Reject signs, whitespace and non-digits up front; int() can still fail
+    # on values longer than Python's integer string conversion limit.
+    if not raw_value.isdecimal():
+        raise ValueError(_ERR_NOT_POSITIVE_INT.format(name))
 
     try:
         value = int(raw_value)
-    except (TypeError, ValueError) as exc:
-        raise ValueError(
-            f"Query parameter '{name}' must be a positive integer."
-        ) from exc
+    except ValueError as exc:
+        raise ValueError(_ERR_NOT_POSITIVE_INT.format(name)) from exc
 
     if value <= 0:
-        raise ValueError(f"Query parameter '{name}' must be a positive integer.")
+        raise ValueError(_ERR_NOT_POSITIVE_INT.format(name))
 
     return value
 
@@ -56,8 +83,10 @@ class MedicationViewSet(viewsets.ModelViewSet):
         """
         Retrieve external drug information from the OpenFDA API.
 
-        Calls the `Medication.fetch_external_info()` method, which
-        delegates to the `DrugInfoService` for API access.
+        Looks up only the medication's name and passes it to
+        `Medication.fetch_drug_info()`, which delegates to the
+        `DrugInfoService`. Successful responses are cached per
+        medication name for an hour; errors are not cached.
 
         Args:
             request (Request): The current HTTP request.
@@ -66,16 +95,25 @@ class MedicationViewSet(viewsets.ModelViewSet):
         Returns:
             Response:
                 - 200 OK: External API data returned successfully.
+                - 404 NOT FOUND: If the medication does not exist.
                 - 502 BAD GATEWAY: If the external API request failed.
 
         Example:
             GET /medications/1/info/
         """
-        medication = self.get_object()
-        data = medication.fetch_external_info()
+        name = get_object_or_404(
+            self.get_queryset().values_list("name", flat=True), pk=pk
+        )
+        cache_key = _external_info_cache_key(name)
+        data = cache.get(cache_key)
+        if data is not None:
+            return Response(data)
+
+        data = Medication.fetch_drug_info(name)
 
         if isinstance(data, dict) and data.get("error"):
             return Response(data, status=status.HTTP_502_BAD_GATEWAY)
+        cache.set(cache_key, data, _EXTERNAL_INFO_CACHE_TIMEOUT)
         return Response(data)
 
     @action(detail=True, methods=["get"], url_path="expected-doses")
@@ -90,23 +128,29 @@ class MedicationViewSet(viewsets.ModelViewSet):
 
         Responses:
             200: {medication_id, days, expected_doses}
-            400: If 'days' is missing/invalid or model computation raises ValueError.
+            400: If 'days' is missing/invalid or the medication has no daily schedule.
+            404: If the medication does not exist.
         """
         try:
             days = _get_required_positive_int_query_param(request, "days")
         except ValueError as exc:
             return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-        medication = self.get_object()
+        # Only the schedule is needed, so skip hydrating a Medication instance.
+        medication_id, prescribed_per_day = get_object_or_404(
+            self.get_queryset().values_list("id", "prescribed_per_day"), pk=pk
+        )
 
         try:
-            expected_dose_count = medication.expected_doses(days)
+            expected_dose_count = Medication.calculate_expected_doses(
+                days, prescribed_per_day
+            )
         except ValueError as exc:
             return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response(
             {
-                "medication_id": medication.id,
+                "medication_id": medication_id,
                 "days": days,
                 "expected_doses": expected_dose_count,
             },
@@ -147,7 +191,8 @@ class DoseLogViewSet(viewsets.ModelViewSet):
         Returns:
             Response:
                 - 200 OK: A list of dose logs between the two dates.
-                - 400 BAD REQUEST: If start or end parameters are missing or invalid.
+                - 400 BAD REQUEST: If start or end parameters are missing or invalid,
+                  or if start is after end.
 
         Example:
             GET /logs/filter/?start=2025-11-01&end=2025-11-07
@@ -163,14 +208,50 @@ class DoseLogViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        logs = (
+        if start > end:
+            return Response(
+                {"error": "'start' must be before or equal to 'end'."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Bounds are converted to UTC here so that dates at the edge of the
+        # datetime range fail as a 400 instead of inside the query. An end
+        # of date.max has no following day, so the upper bound is dropped.
+        try:
+            range_filter = {
+                "taken_at__gte": timezone.make_aware(
+                    datetime.combine(start, time.min)
+                ).astimezone(dt_timezone.utc)
+            }
+            if end < date.max:
+                range_filter["taken_at__lt"] = timezone.make_aware(
+                    datetime.combine(end + timedelta(days=1), time.min)
+                ).astimezone(dt_timezone.utc)
+        except OverflowError:
+            return Response(
+                {"error": "'start' and 'end' are outside the supported date range."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Read-only listing: fetch plain rows instead of running model
+        # instances through the serializer. The keys come from the
+        # serializer's field list so both stay in sync, and taken_at is
+        # localised the way DateTimeField would render it. This relies on
+        # every serializer field mapping directly to a DoseLog column.
+        fields = self.get_serializer_class().Meta.fields
+        columns = [DoseLog._meta.get_field(name).attname for name in fields]
+        rows = (
             self.get_queryset()
-            .filter(taken_at__date__gte=start, taken_at__date__lte=end)
+            .filter(**range_filter)
             .order_by("taken_at")
+            .values_list(*columns)
         )
-
-        serializer = self.get_serializer(logs, many=True)
-        return Response(serializer.data)
+        logs = []
+        for row in rows:
+            log = dict(zip(fields, row))
+            log["taken_at"] = timezone.localtime(log["taken_at"])
+            logs.append(log)
+        return Response(logs)
 
 
 class NoteViewSet(